@@ -4,11 +4,17 @@ Manages environment-specific settings and configurations.
 """
 
 import os
+from functools import lru_cache
 from typing import Dict, Any
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env file (local runs only; Lambda has no .env)
+if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+# Environment names, matched against the lowercased ENVIRONMENT value
+PRODUCTION_ENVIRONMENTS = frozenset({"prod", "production"})
+LOCAL_ENVIRONMENTS = frozenset({"local", "dev", "development"})
 
 class Config:
     """Base configuration class."""
@@ -33,14 +39,15 @@ class Config:
     @classmethod
     def is_production(cls) -> bool:
         """Check if running in production environment."""
-        return cls.ENVIRONMENT.lower() in ["prod", "production"]
+        return IS_PRODUCTION
     
     @classmethod
     def is_local(cls) -> bool:
         """Check if running locally."""
-        return cls.ENVIRONMENT.lower() in ["local", "dev", "development"]
+        return IS_LOCAL
     
     @classmethod
+    @lru_cache(maxsize=None)
     def get_api_key_source(cls) -> str:
         """Get the source of the API key."""
         if cls.FINNHUB_API_KEY:
@@ -51,8 +58,13 @@ class Config:
             return "not_configured"
     
     @classmethod
+    @lru_cache(maxsize=None)
     def validate(cls) -> Dict[str, Any]:
-        """Validate configuration and return status."""
+        """Validate configuration and return status.
+        
+        The result is computed once per process since the inputs are read
+        from the environment at import; treat the returned dict as read-only.
+        """
         status = {
             "valid": True,
             "errors": [],
@@ -77,6 +89,11 @@ class Config:
         
         return status
 
+# Resolve environment checks once at import; the inputs never change in-process
+_ENVIRONMENT_LOWER = Config.ENVIRONMENT.lower()
+IS_PRODUCTION = _ENVIRONMENT_LOWER in PRODUCTION_ENVIRONMENTS
+IS_LOCAL = _ENVIRONMENT_LOWER in LOCAL_ENVIRONMENTS
+
 def print_config_status():
     """Print current configuration status."""
     print("🔧 Configuration Status")
@@ -0,0 +1,44 @@
+"""
+Shared pytest fixtures for the Global Stock Ticker test suites.
+"""
+
+import logging
+import os
+import orjson
+import pytest
+from dotenv import load_dotenv
+
+# Test progress is logged, not printed; TEST_LOG_LEVEL=INFO shows it
+logging.getLogger().setLevel(os.environ.get("TEST_LOG_LEVEL", "WARNING"))
+
+def parse_body(r):
+    """Parse a handler response body once."""
+    return orjson.loads(r["body"])
+
+def assert_ok(r, symbol=None):
+    """Assert a 200 response (optionally for symbol) and return its parsed body."""
+    body = parse_body(r)
+    assert r["statusCode"] == 200, f"status {r['statusCode']}: {body}"
+    if symbol:
+        assert body["symbol"] == symbol
+    return body
+
+@pytest.fixture(scope="session", autouse=True)
+def _load_env():
+    """Parse .env once per test process instead of at every module import."""
+    load_dotenv()
+
+@pytest.fixture(autouse=True)
+def _require_api_key(request, _load_env):
+    """Skip tests that call the live Finnhub API when no API key is configured."""
+    if request.node.get_closest_marker("network") and not os.environ.get("FINNHUB_API_KEY"):
+        pytest.skip("FINNHUB_API_KEY not set")
+
+@pytest.fixture
+def lambda_state(monkeypatch):
+    """Give lambda_function a closed breaker, an empty quote cache and a local key."""
+    import lambda_function
+    monkeypatch.setenv("FINNHUB_API_KEY", "test_api_key_12345")
+    monkeypatch.setattr(lambda_function, "_breaker_failures", 0)
+    monkeypatch.setattr(lambda_function, "_breaker_open_until", 0.0)
+    monkeypatch.setattr(lambda_function, "_QUOTE_CACHE", {})
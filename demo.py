@@ -5,9 +5,16 @@ This script demonstrates how to use the stock ticker functionality.
 """
 
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 from stock_ticker import get_stock_quote, lambda_handler
 
+def _fetch_quote(symbol):
+    """Fetch a quote, returning any error instead of raising it."""
+    try:
+        return get_stock_quote(symbol), None
+    except Exception as e:
+        return None, e
+
 def demo_local_execution():
     """Demonstrate local execution of stock ticker."""
     print("🔍 Local Execution Demo")
@@ -16,23 +23,23 @@ def demo_local_execution():
     # List of popular stocks to demo
     symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
     
-    for symbol in symbols:
-        try:
-            print(f"\n📈 Fetching data for {symbol}...")
-            quote_data = get_stock_quote(symbol)
-            
-            print(f"   Current Price: ${quote_data['current_price']:.2f}")
-            print(f"   Change: ${quote_data['change']:.2f} ({quote_data['change_percent']:.2f}%)")
-            print(f"   High: ${quote_data['high_price']:.2f}")
-            print(f"   Low: ${quote_data['low_price']:.2f}")
-            print(f"   Open: ${quote_data['open_price']:.2f}")
-            print(f"   Previous Close: ${quote_data['previous_close']:.2f}")
-            
-            # Add a small delay to avoid hitting API rate limits
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"   ❌ Error fetching {symbol}: {str(e)}")
+    # Fetch all quotes concurrently; 5 requests fit well within the free tier's 60/min
+    print(f"\n📈 Fetching data for {', '.join(symbols)}...")
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        results = list(executor.map(_fetch_quote, symbols))
+    
+    for symbol, (quote_data, error) in zip(symbols, results):
+        print(f"\n📈 {symbol}")
+        if error is not None:
+            print(f"   ❌ Error fetching {symbol}: {str(error)}")
+            continue
+        
+        print(f"   Current Price: ${quote_data['current_price']:.2f}")
+        print(f"   Change: ${quote_data['change']:.2f} ({quote_data['change_percent']:.2f}%)")
+        print(f"   High: ${quote_data['high_price']:.2f}")
+        print(f"   Low: ${quote_data['low_price']:.2f}")
+        print(f"   Open: ${quote_data['open_price']:.2f}")
+        print(f"   Previous Close: ${quote_data['previous_close']:.2f}")
 
 def demo_lambda_handler():
     """Demonstrate Lambda handler functionality."""
@@ -10,13 +10,32 @@ import zipfile
 import shutil
 import subprocess
 import argparse
+import hashlib
 from pathlib import Path
 
-def run_command(command, check=True):
-    """Run a shell command and handle errors."""
+# Files that go into the deployment package alongside the dependencies
+REQUIREMENTS_FILE = Path("requirements.txt")
+SOURCE_FILES = ["lambda_function.py"]
+
+# Hash of the inputs used for the last package build
+BUILD_HASH_FILE = Path(".deploy-cache") / "hash"
+
+# Wheels are fetched for the Lambda platform rather than the build machine
+LAMBDA_PLATFORM = "manylinux2014_x86_64"
+
+# The bundled urllib3 2.x shadows the runtime's copy; botocore only accepts it
+# on Python 3.10+, so older runtimes can't be targeted
+DEFAULT_RUNTIME = "python3.12"
+
+def run_command(command, check=True, capture=False):
+    """Run a shell command and handle errors.
+    
+    Output streams straight to the terminal unless capture is set, in which
+    case it is collected on the result and echoed once the command finishes.
+    """
     print(f"Running: {command}")
     try:
-        result = subprocess.run(command, shell=True, check=check, capture_output=True, text=True)
+        result = subprocess.run(command, shell=True, check=check, capture_output=capture, text=True)
         if result.stdout:
             print(result.stdout)
         if result.stderr:
@@ -34,13 +53,13 @@ def run_command(command, check=True):
 
 def check_aws_cli():
     """Check if AWS CLI is installed and configured."""
-    result = run_command("aws --version", check=False)
+    result = run_command("aws --version", check=False, capture=True)
     if result.returncode != 0:
         print("❌ AWS CLI is not installed or not in PATH")
         print("Please install AWS CLI: https://aws.amazon.com/cli/")
         sys.exit(1)
     
-    result = run_command("aws sts get-caller-identity", check=False)
+    result = run_command("aws sts get-caller-identity", check=False, capture=True)
     if result.returncode != 0:
         print("❌ AWS CLI is not configured")
         print("Please run: aws configure")
@@ -49,10 +68,30 @@ def check_aws_cli():
     print("✅ AWS CLI is configured")
     return True
 
-def create_package():
+def is_excluded_dir(name):
+    """Check if a packaged directory is unneeded at runtime (bytecode, tests, metadata)."""
+    return name in ("__pycache__", "tests") or name.endswith(".dist-info")
+
+def compute_build_hash(runtime):
+    """Hash the runtime, requirements and source files to detect whether a rebuild is needed."""
+    digest = hashlib.blake2b(runtime.encode())
+    digest.update(REQUIREMENTS_FILE.read_bytes())
+    for source_file in sorted(SOURCE_FILES):
+        digest.update(source_file.encode())
+        digest.update(Path(source_file).read_bytes())
+    return digest.hexdigest()
+
+def create_package(runtime=DEFAULT_RUNTIME):
     """Create deployment package."""
     print("📦 Creating deployment package...")
     
+    # Skip the rebuild when nothing has changed since the last package
+    zip_path = Path("lambda_deployment.zip")
+    build_hash = compute_build_hash(runtime)
+    if zip_path.exists() and BUILD_HASH_FILE.exists() and BUILD_HASH_FILE.read_text() == build_hash:
+        print(f"✅ Package is up to date: {zip_path}")
+        return zip_path
+    
     # Clean up previous package
     package_dir = Path("package")
     if package_dir.exists():
@@ -61,31 +100,44 @@ def create_package():
     # Create package directory
     package_dir.mkdir()
     
-    # Install dependencies
+    # Install dependencies as prebuilt wheels for the Lambda runtime. --no-deps keeps
+    # botocore (pulled in by aws-secretsmanager-caching) out; Lambda provides it.
     print("Installing dependencies...")
-    run_command(f"pip install -r requirements.txt -t {package_dir}")
+    python_version = runtime.removeprefix("python")
+    run_command(
+        f"pip install --no-compile --no-deps --platform {LAMBDA_PLATFORM} --only-binary=:all: "
+        f"--implementation cp --python-version {python_version} "
+        f"-r {REQUIREMENTS_FILE} -t {package_dir}"
+    )
     
     # Copy source files
     print("Copying source files...")
-    shutil.copy("stock_ticker_simple.py", package_dir)
-    shutil.copy("lambda_function.py", package_dir)
+    for source_file in SOURCE_FILES:
+        shutil.copy(source_file, package_dir)
     
     # Create zip file
     print("Creating zip file...")
-    zip_path = Path("lambda_deployment.zip")
     if zip_path.exists():
         zip_path.unlink()
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for file_path in package_dir.rglob('*'):
-            if file_path.is_file():
-                arcname = file_path.relative_to(package_dir)
-                zipf.write(file_path, arcname)
+    base = str(package_dir) + os.sep
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+        for root, dirs, files in os.walk(package_dir):
+            # Prune excluded directories so os.walk never descends into them
+            dirs[:] = [d for d in dirs if not is_excluded_dir(d)]
+            for name in files:
+                if name.endswith(".pyc"):
+                    continue
+                full_path = os.path.join(root, name)
+                zipf.write(full_path, full_path[len(base):])
+    
+    BUILD_HASH_FILE.parent.mkdir(exist_ok=True)
+    BUILD_HASH_FILE.write_text(build_hash)
     
     print(f"✅ Package created: {zip_path}")
     return zip_path
 
-def deploy_lambda(function_name, role_arn, runtime="python3.9", region="us-east-1"):
+def deploy_lambda(function_name, role_arn, runtime=DEFAULT_RUNTIME, region="us-east-1", memory_size=1024):
     """Deploy Lambda function."""
     print(f"🚀 Deploying Lambda function: {function_name}")
     
@@ -95,27 +147,49 @@ def deploy_lambda(function_name, role_arn, runtime="python3.9", region="us-east-
         sys.exit(1)
     
     # Check if function exists
-    result = run_command(f"aws lambda get-function --function-name {function_name} --region {region}", check=False)
+    result = run_command(f"aws lambda get-function --function-name {function_name} --region {region}", check=False, capture=True)
     
     if result.returncode == 0:
         # Function exists, update it
         print("Updating existing function...")
         run_command(f"aws lambda update-function-code --function-name {function_name} --zip-file fileb://{zip_path} --region {region}")
-        run_command(f"aws lambda update-function-configuration --function-name {function_name} --runtime {runtime} --region {region}")
+        run_command(f"aws lambda update-function-configuration --function-name {function_name} --runtime {runtime} --memory-size {memory_size} --region {region}")
     else:
         # Function doesn't exist, create it
         print("Creating new function...")
-        run_command(f"aws lambda create-function --function-name {function_name} --runtime {runtime} --role {role_arn} --handler lambda_function.lambda_handler --zip-file fileb://{zip_path} --region {region}")
+        run_command(f"aws lambda create-function --function-name {function_name} --runtime {runtime} --role {role_arn} --handler lambda_function.lambda_handler --memory-size {memory_size} --zip-file fileb://{zip_path} --region {region}")
     
     print(f"✅ Lambda function '{function_name}' deployed successfully!")
 
+def configure_provisioned_concurrency(function_name, executions, region="us-east-1", alias="live"):
+    """Publish a version behind an alias and keep that many environments initialized."""
+    print(f"🔥 Configuring provisioned concurrency: {executions} on alias '{alias}'")
+    
+    # Wait for the code/configuration update to settle before publishing
+    run_command(f"aws lambda wait function-updated --function-name {function_name} --region {region}")
+    result = run_command(f"aws lambda publish-version --function-name {function_name} --query Version --output text --region {region}", capture=True)
+    version = result.stdout.strip()
+    
+    result = run_command(f"aws lambda get-alias --function-name {function_name} --name {alias} --region {region}", check=False, capture=True)
+    if result.returncode == 0:
+        run_command(f"aws lambda update-alias --function-name {function_name} --name {alias} --function-version {version} --region {region}")
+    else:
+        run_command(f"aws lambda create-alias --function-name {function_name} --name {alias} --function-version {version} --region {region}")
+    
+    run_command(f"aws lambda put-provisioned-concurrency-config --function-name {function_name} --qualifier {alias} --provisioned-concurrent-executions {executions} --region {region}")
+    print(f"✅ Provisioned concurrency requested; invoke '{function_name}:{alias}' to use the warm environments")
+
 def main():
     parser = argparse.ArgumentParser(description="Deploy Stock Ticker to AWS Lambda")
     parser.add_argument("--package-only", action="store_true", help="Only create package, don't deploy")
     parser.add_argument("--function-name", default="stock-ticker", help="Lambda function name")
     parser.add_argument("--role-arn", required=True, help="IAM role ARN for Lambda execution")
-    parser.add_argument("--runtime", default="python3.9", help="Python runtime version")
+    parser.add_argument("--runtime", default=DEFAULT_RUNTIME, help="Python runtime version")
     parser.add_argument("--region", default="us-east-1", help="AWS region")
+    # Lambda allocates CPU in proportion to memory; 1024 MB gets imports and the TLS
+    # handshake done far faster than the 128 MB default
+    parser.add_argument("--memory-size", type=int, default=1024, help="Lambda memory in MB (also scales vCPU)")
+    parser.add_argument("--provisioned-concurrency", type=int, default=0, help="Initialized environments to keep on the 'live' alias (0 disables)")
     
     args = parser.parse_args()
     
@@ -126,19 +200,22 @@ def main():
     check_aws_cli()
     
     # Create package
-    package_path = create_package()
+    package_path = create_package(args.runtime)
     
     if args.package_only:
         print("📦 Package created successfully. Use --deploy to deploy to Lambda.")
         return
     
     # Deploy to Lambda
-    deploy_lambda(args.function_name, args.role_arn, args.runtime, args.region)
+    deploy_lambda(args.function_name, args.role_arn, args.runtime, args.region, args.memory_size)
+    if args.provisioned_concurrency > 0:
+        configure_provisioned_concurrency(args.function_name, args.provisioned_concurrency, args.region)
     
     print("\n🎉 Deployment completed successfully!")
     print(f"Function: {args.function_name}")
     print(f"Region: {args.region}")
     print(f"Runtime: {args.runtime}")
+    print(f"Memory: {args.memory_size} MB")
     print("\nYou can now test your function:")
     print(f"aws lambda invoke --function-name {args.function_name} --payload '{{\"symbol\":\"AAPL\"}}' --region {args.region} response.json")
 
@@ -1,57 +1,209 @@
-﻿import json
-import boto3
+﻿import base64
+import gzip
 import os
+import time
 import logging
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from pybreaker import CircuitBreaker, CircuitBreakerError
-import requests
-from requests.exceptions import RequestException, Timeout
-from dotenv import load_dotenv
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import orjson
+import urllib3
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (local runs only; Lambda has no .env)
+if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
-# Configure logging
+# Configure logging; LOG_LEVEL=DEBUG turns on the verbose request/response logs
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+# Skip per-record thread/process lookups and the caller frame walk; the Lambda
+# log format doesn't use them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging._srcfile = None
+
+class CircuitBreakerError(Exception):
+    """Raised when the Finnhub circuit breaker is open."""
+
+class FinnhubAPIError(Exception):
+    """Raised when Finnhub responds with a server error or throttling status."""
+
+class FinnhubClientError(Exception):
+    """Raised when Finnhub rejects a request (e.g. 403 for premium symbols); doesn't trip the breaker."""
+    def __init__(self, status):
+        super().__init__(f"HTTP {status} from Finnhub API")
+        self.status = status
 
 # Circuit breaker for Finnhub API calls
-finnhub_breaker = CircuitBreaker(
-    fail_max=5,           # Open circuit after 5 failures
-    reset_timeout=60,      # Wait 60 seconds before trying again
-    exclude=[RequestException]  # Exclude these exceptions from counting as failures
+_BREAKER_FAIL_MAX = 5        # Open circuit after 5 failed calls
+_BREAKER_RESET_TIMEOUT = 60  # Wait 60 seconds before trying again
+_breaker_failures = 0
+_breaker_open_until = 0.0
+_breaker_lock = threading.Lock()  # batch requests update the counts from _POOL threads
+
+# Pooled HTTP client reused across warm invocations to skip the TLS handshake;
+# urllib3 retries connection errors and transient statuses with a short backoff.
+# Retry-After is ignored so a throttled upstream can't park the worker for its
+# full delay; once retries run out the handler answers 503 straight away.
+_FINNHUB_TIMEOUT = urllib3.Timeout(connect=1.0, read=3.0)
+_REQUEST_HEADERS = {"User-Agent": "quote-svc/1.0"}
+_RETRY = urllib3.Retry(
+    total=2,
+    connect=1,
+    read=1,
+    backoff_factor=0.1,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=False
+)
+# Up to 32 idle connections per host are kept; block=False opens an extra socket
+# rather than waiting when a burst exceeds that, and only 32 are returned to the pool
+_HTTP = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=32,
+    block=False,
+    retries=_RETRY,
+    headers=_REQUEST_HEADERS
 )
 
+# Worker threads for batch requests ({"symbols": [...]}); kept within the HTTP
+# pool size so every concurrent fetch gets its own pooled connection
+_POOL = ThreadPoolExecutor(max_workers=16)
+_BATCH_MAX = 20
+_BATCH_TIMEOUT = 4.0  # seconds for the whole batch
+
+# Failures that count toward opening the circuit breaker: transport errors and
+# 5xx/429; other 4xx are about the request (FinnhubClientError), not Finnhub's health
+_BREAKER_ERRORS = (urllib3.exceptions.HTTPError, FinnhubAPIError)
+
+# Per-container quote cache: symbol -> (fetched_at, data, body, body_gzip_b64).
+# Bursts of requests for the same symbol share one upstream call and one
+# serialized (and gzip-compressed) response body per QUOTE_TTL window
+_QUOTE_TTL = float(os.environ.get("QUOTE_TTL", "1.0"))
+_QUOTE_CACHE_MAX = 256
+_QUOTE_CACHE = {}
+
+# Shared quote cache (ElastiCache/Valkey) so concurrent containers make one
+# upstream call per symbol per TTL window; only used when CACHE_HOST is set
+_CACHE_HOST = os.environ.get("CACHE_HOST")
+_CACHE_PORT = int(os.environ.get("CACHE_PORT", "6379"))
+_SHARED_QUOTE_TTL_MS = max(1, int(_QUOTE_TTL * 1000))
+# How long one worker owns the upstream fetch; never outlives the quote, so a
+# stale lock can't make other workers wait on a fetch that already finished
+_SHARED_LOCK_MS = min(2000, _SHARED_QUOTE_TTL_MS)
+_SHARED_WAIT_POLLS = 10      # other workers poll for its result...
+_SHARED_WAIT_INTERVAL = 0.05  # ...this often before calling Finnhub themselves
+_RC = None
+
 cached_api_key = None
 
-def get_api_key():
-    global cached_api_key
+# Finnhub quote URL is built as _URL_PREFIX + symbol + _URL_SUFFIX; the suffix
+# carries the token and is filled in once the API key has been resolved
+_URL_PREFIX = "https://finnhub.io/api/v1/quote?symbol="
+_URL_SUFFIX = ""
+
+# Secrets Manager cache, created on first use so env-key runs never import boto3;
+# it refreshes the secret hourly so rotated keys are picked up without a redeploy
+_SM_CACHE = None
+_SECRET_REFRESH_INTERVAL = 3600
+
+# Stale-while-revalidate for the secret-backed key: shortly before it expires a
+# single background thread re-fetches it while invocations keep using the old one
+_KEY_REFRESH_AHEAD = 30
+_KEY_RETRY_INTERVAL = 60
+_key_expires_at = 0.0
+_key_refresh_lock = threading.Lock()
+
+# Ticker symbols we pass upstream (e.g. AAPL, BRK.B, BINANCE:BTCUSDT); anything else
+# is rejected before it reaches Finnhub or the quote/URL caches
+_SYMBOL_RE = re.compile(r"[A-Z0-9.\-:]{1,20}")
+
+def _set_api_key(api_key):
+    global cached_api_key, _URL_SUFFIX
+    changed = api_key != cached_api_key
+    cached_api_key = api_key
+    _URL_SUFFIX = "&token=" + api_key
+    if changed:
+        # Memoized URLs embed the old token; drop them once the new suffix is live
+        _build_url.cache_clear()
+    return cached_api_key
+
+@lru_cache(maxsize=256)
+def _build_url(symbol):
+    return _URL_PREFIX + symbol + _URL_SUFFIX
+
+@lru_cache(maxsize=1)
+def _parse_api_key(secret_string):
+    return orjson.loads(secret_string)["FINNHUB_API_KEY"]
+
+def _fetch_secret_api_key(secret_name, region_name, force=False):
+    global _SM_CACHE
+    if _SM_CACHE is None:
+        logger.info(" Secrets Manager config - Secret: %s, Region: %s", secret_name, region_name)
+        import boto3
+        from botocore.config import Config as BotoConfig
+        from aws_secretsmanager_caching import SecretCache, SecretCacheConfig
+        client = boto3.client(
+            "secretsmanager",
+            region_name=region_name,
+            config=BotoConfig(
+                connect_timeout=1,
+                read_timeout=2,
+                retries={"max_attempts": 2},
+                max_pool_connections=1,
+                tcp_keepalive=True  # keep the pooled TLS socket alive between invocations
+            )
+        )
+        _SM_CACHE = SecretCache(
+            config=SecretCacheConfig(secret_refresh_interval=_SECRET_REFRESH_INTERVAL, max_cache_size=16),
+            client=client
+        )
     
-    if cached_api_key:
-        logger.info(" Using cached API key (first 8 chars): %s", cached_api_key[:8] + "..." if cached_api_key else "None")
-        return cached_api_key
+    if force:
+        _SM_CACHE.refresh_secret_now(secret_name)
+    return _parse_api_key(_SM_CACHE.get_secret_string(secret_name))
+
+def _refresh_api_key(secret_name, region_name):
+    """Re-fetch the key in the background; the caller holds _key_refresh_lock."""
+    global _key_expires_at
+    try:
+        api_key = _fetch_secret_api_key(secret_name, region_name, force=True)
+        if api_key != cached_api_key:
+            logger.info(" Picked up rotated API key from Secrets Manager (first 8 chars): %.8s...", api_key)
+        _set_api_key(api_key)
+        _key_expires_at = time.monotonic() + _SECRET_REFRESH_INTERVAL
+    except Exception as e:
+        # Keep serving the current key and try again after a short pause
+        logger.warning(" Background API key refresh failed: %s", str(e))
+        _key_expires_at = time.monotonic() + _KEY_REFRESH_AHEAD + _KEY_RETRY_INTERVAL
+    finally:
+        _key_refresh_lock.release()
 
+def get_api_key():
+    global _key_expires_at
+    
     env_key = os.environ.get("FINNHUB_API_KEY")
     if env_key:
-        logger.info(" Found API key in environment variable (first 8 chars): %s", env_key[:8] + "...")
-        cached_api_key = env_key
-        return cached_api_key
+        if env_key != cached_api_key:
+            logger.info(" Found API key in environment variable (first 8 chars): %.8s...", env_key)
+        return _set_api_key(env_key)
 
     secret_name = os.environ.get("SECRET_NAME", "prod/finnhub/api_key")
     region_name = os.environ.get("AWS_REGION", "us-east-1")
     
-    logger.info(" Secrets Manager config - Secret: %s, Region: %s", secret_name, region_name)
+    if _key_expires_at:
+        if time.monotonic() >= _key_expires_at - _KEY_REFRESH_AHEAD and _key_refresh_lock.acquire(blocking=False):
+            threading.Thread(target=_refresh_api_key, args=(secret_name, region_name), daemon=True).start()
+        return cached_api_key
 
     try:
-        client = boto3.client("secretsmanager", region_name=region_name)
-        
-        resp = client.get_secret_value(SecretId=secret_name)
-        
-        secret_dict = json.loads(resp["SecretString"])
-        cached_api_key = secret_dict["FINNHUB_API_KEY"]
-        
-        logger.info(" Successfully retrieved API key from Secrets Manager (first 8 chars): %s", cached_api_key[:8] + "...")
-        return cached_api_key
+        api_key = _fetch_secret_api_key(secret_name, region_name)
+        logger.info(" Successfully retrieved API key from Secrets Manager (first 8 chars): %.8s...", api_key)
+        _key_expires_at = time.monotonic() + _SECRET_REFRESH_INTERVAL
+        return _set_api_key(api_key)
         
     except Exception as e:
         logger.error(" Failed to retrieve API key from Secrets Manager: %s", str(e))
@@ -77,7 +229,7 @@ def _extract_symbol_from_sqs_message(message_body):
     try:
         # Parse the message body as JSON if it's a string
         if isinstance(message_body, str):
-            message_data = json.loads(message_body)
+            message_data = orjson.loads(message_body)
         else:
             message_data = message_body
 
@@ -108,7 +260,7 @@ def _extract_symbol_from_sqs_message(message_body):
         logger.warning("No symbol found in SQS message, using default: AAPL")
         return "AAPL"
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error("Failed to parse SQS message body as JSON: %s", str(e))
         return "AAPL"
     except Exception as e:
@@ -116,137 +268,308 @@ def _extract_symbol_from_sqs_message(message_body):
         return "AAPL"
 
 def _extract_symbol(event):
-    logger.info("Incoming Event : %s", event)
-    
-    if not isinstance(event, dict):
-        logger.warning(" Event is not a dictionary, using default symbol AAPL")
-        return "AAPL"
-    
-    # Handle SQS batch events
-    if "Records" in event:
-        logger.info("Detected SQS event. Processing SQS batch event with %d records", len(event["Records"]))
-        if event["Records"]:
-            # Process the first record (we'll handle batch processing later)
-            first_record = event["Records"][0]
-            message_body = first_record.get("body", "")
-            logger.info("Processing first SQS record: %s", first_record.get("messageId", "unknown"))
-            symbol = _extract_symbol_from_sqs_message(message_body)
-            logger.info("Symbol extracted from SQS: %s", symbol)
-            return symbol
-        else:
-            logger.warning("SQS event has no records, using default symbol AAPL")
-            return "AAPL"
-    
     # direct invoke: {"symbol":"AAPL"}
-    if "symbol" in event and isinstance(event["symbol"], str) and event["symbol"]:
-        logger.info(" Found symbol in direct event: %s", event["symbol"])
-        return event["symbol"]
+    symbol = event.get("symbol")
+    if symbol:
+        return symbol
     
     # API Gateway REST API with path parameters: /quote/{symbol}
-    if "pathParameters" in event and event["pathParameters"]:
-        symbol = event["pathParameters"].get("symbol")
+    path_params = event.get("pathParameters")
+    if path_params:
+        symbol = path_params.get("symbol")
         if symbol:
-            logger.info(" Found symbol in pathParameters: %s", symbol)
             return symbol
-        else:
-            logger.info(" pathParameters exists but no symbol found: %s", event["pathParameters"])
-    else:
-        logger.info(" No pathParameters in event")
     
     # API Gateway with query parameters: /quote?symbol=TSLA
-    q = event.get("queryStringParameters") or {}
-    if isinstance(q, dict) and q.get("symbol"):
-        logger.info(" Found symbol in queryStringParameters: %s", q.get("symbol"))
-        return q["symbol"]
-    else:
-        logger.info(" No symbol in queryStringParameters: %s", q)
+    query_params = event.get("queryStringParameters")
+    if query_params:
+        symbol = query_params.get("symbol")
+        if symbol:
+            return symbol
+    
+    # SQS batch events: use the first record (we'll handle batch processing later)
+    records = event.get("Records")
+    if records:
+        return _extract_symbol_from_sqs_message(records[0].get("body", ""))
     
-    logger.info(" No symbol found, using default: AAPL")
     return "AAPL"
 
-@finnhub_breaker
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),
-    retry=retry_if_exception_type((RequestException, Timeout))
-)
-def _call_finnhub(url, timeout=5):
+def _extract_symbols(event):
+    """Return the requested symbols for a batch request, or None for a single quote."""
+    # direct invoke: {"symbols":["AAPL","MSFT"]}
+    symbols = event.get("symbols")
+    if symbols:
+        return symbols.split(",") if isinstance(symbols, str) else symbols
+    
+    # API Gateway with query parameters: /quote?symbols=AAPL,MSFT
+    query_params = event.get("queryStringParameters")
+    if query_params and query_params.get("symbols"):
+        return query_params["symbols"].split(",")
+    
+    return None
+
+def _get_quotes(symbols):
+    """Fetch quotes concurrently; returns (quotes, errors) keyed by symbol."""
+    futures = {symbol: _POOL.submit(_get_quote, symbol) for symbol in symbols}
+    deadline = time.monotonic() + _BATCH_TIMEOUT
+    quotes = {}
+    errors = {}
+    for symbol, future in futures.items():
+        try:
+            quotes[symbol] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception as e:
+            logger.error(" Quote for %s failed: %s", symbol, type(e).__name__)
+            errors[symbol] = "rejected" if isinstance(e, FinnhubClientError) else "unavailable"
+    return quotes, errors
+
+def _call_finnhub(url):
     """Call Finnhub API with automatic retries and circuit breaker protection."""
+    global _breaker_failures, _breaker_open_until
+    
+    if _breaker_open_until > time.monotonic():
+        raise CircuitBreakerError("Circuit breaker is open for Finnhub API")
+    
+    try:
+        data = _request_finnhub(url)
+    except _BREAKER_ERRORS:
+        with _breaker_lock:
+            _breaker_failures += 1
+            if _breaker_failures >= _BREAKER_FAIL_MAX:
+                _breaker_open_until = time.monotonic() + _BREAKER_RESET_TIMEOUT
+        raise
+    
+    with _breaker_lock:
+        _breaker_failures = 0
+    return data
+
+def _request_finnhub(url):
+    """Make a Finnhub API request through the shared connection pool."""
     logger.info(" Making request to Finnhub API")
-    logger.info(" URL (masked): %s", url.replace(url.split('token=')[1] if 'token=' in url else '', '***MASKED***'))
-    logger.info(" Timeout: %s seconds", timeout)
+    logger.info(" Timeout: %s", _FINNHUB_TIMEOUT)
     
     try:
-        response = requests.get(
-            url, 
-            timeout=timeout,
-            headers={"User-Agent": "quote-svc/1.0"}
-        )
-        
-        logger.info(" Response status code: %s", response.status_code)
-        logger.info(" Response headers: %s", dict(response.headers))
-        
-        response.raise_for_status()  # Raises HTTPError for bad status codes
+        # Stream the body so error responses are drained without being buffered
+        response = _HTTP.request("GET", url, timeout=_FINNHUB_TIMEOUT, preload_content=False)
+        try:
+            logger.info(" Response status code: %s", response.status)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(" Response headers: %s", dict(response.headers))
+            
+            if response.status >= 400:
+                response.drain_conn()
+                if response.status >= 500 or response.status == 429:
+                    raise FinnhubAPIError(f"HTTP {response.status} from Finnhub API")
+                raise FinnhubClientError(response.status)
+            
+            data = orjson.loads(response.read())
+        finally:
+            response.release_conn()
         
-        data = response.json()
         logger.info(" Successfully received data from Finnhub API")
-        logger.info(" Response data keys: %s", list(data.keys()) if isinstance(data, dict) else "Not a dict")
-        
         return data
         
-    except Timeout as e:
-        logger.error(" Request timeout after %s seconds: %s", timeout, str(e))
-        raise
-    except RequestException as e:
+    except (*_BREAKER_ERRORS, FinnhubClientError) as e:
         logger.error(" Request failed: %s", str(e))
         raise
     except Exception as e:
         logger.error(" Unexpected error in _call_finnhub: %s", str(e))
         raise
 
+def _get_shared_cache():
+    global _RC
+    if _RC is None and _CACHE_HOST:
+        import redis
+        _RC = redis.Redis(
+            host=_CACHE_HOST,
+            port=_CACHE_PORT,
+            socket_connect_timeout=0.1,
+            socket_timeout=0.2
+        )
+    return _RC
+
+def _fetch_quote(symbol):
+    """Fetch quote data through the shared cache when configured, else from Finnhub."""
+    rc = _get_shared_cache()
+    if rc is None:
+        return _call_finnhub(_build_url(symbol))
+    
+    key = "q:" + symbol
+    lock_key = "lock:" + key
+    owns_lock = False
+    try:
+        raw = rc.get(key)
+        if raw is None:
+            owns_lock = bool(rc.set(lock_key, 1, nx=True, px=_SHARED_LOCK_MS))
+        if raw is None and not owns_lock:
+            # Another worker is already fetching this symbol; wait briefly for its result
+            for _ in range(_SHARED_WAIT_POLLS):
+                time.sleep(_SHARED_WAIT_INTERVAL)
+                raw = rc.get(key)
+                if raw is not None:
+                    break
+        if raw is not None:
+            return orjson.loads(raw)
+    except Exception as e:
+        # The shared cache is only an optimization; fall back to Finnhub without it
+        logger.warning(" Shared quote cache unavailable: %s", str(e))
+        return _call_finnhub(_build_url(symbol))
+    
+    try:
+        data = _call_finnhub(_build_url(symbol))
+        try:
+            rc.set(key, orjson.dumps(data), px=_SHARED_QUOTE_TTL_MS)
+        except Exception as e:
+            logger.warning(" Failed to store quote in shared cache: %s", str(e))
+    finally:
+        if owns_lock:
+            # Release the fetch straight away so waiters don't sit out the lock TTL
+            try:
+                rc.delete(lock_key)
+            except Exception as e:
+                logger.warning(" Failed to release shared cache lock: %s", str(e))
+    return data
+
+def _get_quote(symbol):
+    """Return quote data for a symbol, serving from the TTL cache when fresh."""
+    return _get_quote_entry(symbol)[1]
+
+def _get_quote_entry(symbol):
+    """Return the (fetched_at, data, body, body_gzip_b64) cache entry for a symbol, refreshing it when stale."""
+    now = time.monotonic()
+    hit = _QUOTE_CACHE.get(symbol)
+    if hit and now - hit[0] < _QUOTE_TTL:
+        logger.debug(" Serving %s from quote cache", symbol)
+        return hit
+    
+    logger.info(" Constructed Finnhub URL (masked): %s%s&token=***MASKED***", _URL_PREFIX, symbol)
+    data = _fetch_quote(symbol)
+    body = orjson.dumps({
+        "symbol": symbol,
+        "current_price": data.get("c"),
+        "quote_data": data
+    }).decode()
+    
+    # Re-insert at the end so the oldest entry is the first one evicted
+    body_gzip_b64 = base64.b64encode(gzip.compress(body.encode(), compresslevel=6)).decode()
+    entry = (now, data, body, body_gzip_b64)
+    _QUOTE_CACHE.pop(symbol, None)
+    if len(_QUOTE_CACHE) >= _QUOTE_CACHE_MAX:
+        _QUOTE_CACHE.pop(next(iter(_QUOTE_CACHE)), None)
+    _QUOTE_CACHE[symbol] = entry
+    return entry
+
+# Shared CORS headers for requests without an Origin; this and the memoized
+# per-origin dicts below are shared across responses, so treat them as read-only
+_CORS_STAR = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Max-Age": "3600"
+}
+
+@lru_cache(maxsize=64)
 def get_cors_headers(origin):
-    logger.info(" Setting up CORS headers for origin: %s", origin if origin else "None")
-    headers = {
-        "Content-Type": "application/json",
-        "Access-Control-Allow-Origin": origin if origin else "*",
-        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type",
-        "Access-Control-Max-Age": "3600"
-    }
-    logger.info(" CORS headers: %s", headers)
-    return headers
+    return _CORS_STAR if not origin else {**_CORS_STAR, "Access-Control-Allow-Origin": origin}
+
+@lru_cache(maxsize=64)
+def _gzip_cors_headers(origin):
+    return {**get_cors_headers(origin), "Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+
+def _init():
+    """Warm the Finnhub connection, API key and JSON parser during Lambda Init."""
+    try:
+        # Resolves DNS and completes the TLS handshake; the socket stays in _HTTP's pool
+        _HTTP.request("HEAD", "https://finnhub.io/", timeout=_FINNHUB_TIMEOUT, retries=False)
+    except urllib3.exceptions.HTTPError as e:
+        logger.warning(" Could not pre-open Finnhub connection: %s", str(e))
+    
+    # get_api_key() logs failures; the handler retries the fetch on each call
+    try:
+        get_api_key()
+    except Exception:
+        pass
+    
+    orjson.loads(b'{"c":0.0,"d":0.0,"dp":0.0,"h":0.0,"l":0.0,"o":0.0,"pc":0.0,"t":0}')
+
+# Init runs before the first request (and ahead of time under provisioned
+# concurrency), so doing the warm-up here keeps it off the request path
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    _init()
 
 def lambda_handler(event, context):
     logger.info(" Lambda function started")
-    logger.info(" Event: %s", json.dumps(event, default=str)[:500] + "..." if len(str(event)) > 500 else json.dumps(event, default=str))
-    logger.info(" Context: %s", str(context)[:200] + "..." if context and len(str(context)) > 200 else str(context))
+    if logger.isEnabledFor(logging.DEBUG):
+        event_str = orjson.dumps(event, default=str).decode()
+        logger.debug(" Event: %s", event_str[:500] + "..." if len(event_str) > 500 else event_str)
+        logger.debug(" Context: %.200s", context)
+    
+    # Resolve CORS headers once for every response path below
+    headers = event.get("headers") or {}
+    origin = headers.get("origin", "")
+    cors_headers = get_cors_headers(origin)
+    logger.info(" Origin: %s", origin)
     
     # Handle preflight OPTIONS request
     if event.get("httpMethod") == "OPTIONS":
         logger.info(" Handling OPTIONS preflight request")
-        origin = event.get("headers", {}).get("origin", "")
-        logger.info(" Origin for OPTIONS: %s", origin)
         
         response = {
             "statusCode": 200,
-            "headers": get_cors_headers(origin),
+            "headers": cors_headers,
             "body": ""
         }
         logger.info(" OPTIONS response: %s", response)
         return response
     
     try:
-        api_key = get_api_key()
+        get_api_key()
+        
+        symbols = _extract_symbols(event)
+        if symbols is not None:
+            # De-duplicate while keeping the requested order; anything but a
+            # list or comma-separated string is rejected below
+            if isinstance(symbols, list):
+                symbols = list(dict.fromkeys(str(s).strip().upper() for s in symbols))
+            if (not isinstance(symbols, list) or len(symbols) > _BATCH_MAX
+                    or not all(_SYMBOL_RE.fullmatch(s) for s in symbols)):
+                logger.warning(" Rejecting invalid batch of symbols: %.80s", symbols)
+                return {
+                    "statusCode": 400,
+                    "headers": cors_headers,
+                    "body": orjson.dumps({"error": f"Invalid symbols (at most {_BATCH_MAX})"}).decode()
+                }
+            logger.info(" Using symbols: %s", symbols)
+            
+            quotes, errors = _get_quotes(symbols)
+            body = {
+                "quotes": {
+                    symbol: {"current_price": data.get("c"), "quote_data": data}
+                    for symbol, data in quotes.items()
+                },
+                "errors": errors
+            }
+            return {
+                "statusCode": 200 if quotes else 503,
+                "headers": cors_headers,
+                "body": orjson.dumps(body).decode()
+            }
         
         symbol = _extract_symbol(event)
+        if isinstance(symbol, str):
+            symbol = symbol.upper()
+        if not isinstance(symbol, str) or not _SYMBOL_RE.fullmatch(symbol):
+            logger.warning(" Rejecting invalid symbol: %.40s", symbol)
+            return {
+                "statusCode": 400,
+                "headers": cors_headers,
+                "body": orjson.dumps({"error": "Invalid symbol"}).decode()
+            }
         logger.info(" Using symbol: %s", symbol)
         
-        url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={api_key}"
-        logger.info(" Constructed Finnhub URL (masked): %s", url.replace(api_key, "***MASKED***"))
-        
         try:
-            data = _call_finnhub(url)
-            logger.info(" Successfully received data from Finnhub")
+            _, _, body, body_gzip_b64 = _get_quote_entry(symbol)
+            logger.info(" Quote data ready for %s", symbol)
             
         except CircuitBreakerError as e:
             logger.error(" Circuit breaker is OPEN - Finnhub service unavailable")
@@ -255,30 +578,50 @@ def lambda_handler(event, context):
             # Circuit is open - return cached data or error
             response = {
                 "statusCode": 503,
-                "headers": get_cors_headers(event.get("headers", {}).get("origin", "")),
-                "body": json.dumps({
+                "headers": cors_headers,
+                "body": orjson.dumps({
                     "error": "Service temporarily unavailable - circuit breaker open",
                     "symbol": symbol
-                })
+                }).decode()
             }
             logger.info(" Returning 503 response: %s", response)
             return response
+        
+        except FinnhubClientError as e:
+            logger.error(" Finnhub rejected the request for %s: HTTP %s", symbol, e.status)
+            return {
+                "statusCode": 502,
+                "headers": cors_headers,
+                "body": orjson.dumps({"error": "upstream_rejected", "symbol": symbol}).decode()
+            }
+        
+        except urllib3.exceptions.MaxRetryError as e:
+            logger.error(" Finnhub unavailable after retries: %s", type(e.reason).__name__)
+            return {
+                "statusCode": 503,
+                "headers": cors_headers,
+                "body": orjson.dumps({"error": "upstream_unavailable", "symbol": symbol}).decode()
+            }
 
-        body = {
-            "symbol": symbol,
-            "current_price": data.get("c"),
-            "quote_data": data
-        }
-        logger.info(" Response body: %s", json.dumps(body, default=str))
+        logger.debug(" Response body: %s", body)
         
-        # Get origin for CORS headers
-        origin = event.get("headers", {}).get("origin", "")
-        logger.info(" Origin for response: %s", origin)
+        # The body was serialized (and compressed) once when the quote was cached.
+        # Only payload v2 callers (HTTP APIs, Function URLs) always decode
+        # isBase64Encoded; a REST API would pass the base64 text through unless
+        # binary media types are configured, so those callers get plain JSON
+        accept_encoding = headers.get("accept-encoding") or headers.get("Accept-Encoding") or ""
+        if event.get("version") == "2.0" and "gzip" in accept_encoding:
+            return {
+                "statusCode": 200,
+                "headers": _gzip_cors_headers(origin),
+                "body": body_gzip_b64,
+                "isBase64Encoded": True
+            }
         
         response = {
             "statusCode": 200,
-            "headers": get_cors_headers(origin),
-            "body": json.dumps(body)
+            "headers": cors_headers,
+            "body": body
         }
         
         logger.info(" Successfully processed request")
@@ -289,13 +632,10 @@ def lambda_handler(event, context):
         logger.error(" Error type: %s", type(e).__name__)
         logger.error(" Full error details: %s", str(e))
         
-        # Get origin for CORS headers
-        origin = event.get("headers", {}).get("origin", "")
-        
         response = {
             "statusCode": 500,
-            "headers": get_cors_headers(origin),
-            "body": json.dumps({"error": str(e)})
+            "headers": cors_headers,
+            "body": orjson.dumps({"error": str(e)}).decode()
         }
         
         logger.error(" Returning 500 error response: %s", response)
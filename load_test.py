@@ -10,15 +10,25 @@ Test Scenarios:
 
 import random
 import time
-from locust import HttpUser, task, between
-import json
+from locust import task, between
+from locust.contrib.fasthttp import FastHttpUser
+import orjson
 
-class StockTickerUser(HttpUser):
+def has_price(body):
+    """Check for a non-null current_price in the raw body without parsing the JSON (shared with stock_api_load_test.py)."""
+    return b'"current_price":' in body and b'"current_price":null' not in body
+
+class StockTickerUser(FastHttpUser):
     """Locust user class for testing the Stock Ticker API"""
     
     # Base URL for the API
     host = "https://q12h96ifp0.execute-api.us-east-1.amazonaws.com"
     
+    # geventhttpclient-based client: much cheaper per request than requests,
+    # so one load generator can drive far more RPS
+    network_timeout = 5.0
+    connection_timeout = 2.0
+    
     # Wait time between tasks (200ms = 0.2 seconds)
     wait_time = between(0.2, 0.2)  # Fixed 200ms delay
     
@@ -30,10 +40,6 @@ class StockTickerUser(HttpUser):
         "ABBV", "ACN", "DHR", "VZ", "NKE", "TXN", "QCOM", "NEE", "HON"
     ]
     
-    def on_start(self):
-        """Called when a user starts"""
-        print(f"🚀 Starting load test for user")
-    
     @task(3)
     def test_stock_quote_with_symbol(self):
         """Test API with specific stock symbol (75% of requests)"""
@@ -41,18 +47,12 @@ class StockTickerUser(HttpUser):
         endpoint = f"/DEV/quote/{symbol}"
         
         with self.client.get(endpoint, catch_response=True) as response:
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    if "current_price" in data and data["current_price"] is not None:
-                        response.success()
-                        print(f"✅ {symbol}: ${data['current_price']}")
-                    else:
-                        response.failure(f"Invalid response format for {symbol}")
-                except json.JSONDecodeError:
-                    response.failure(f"Invalid JSON response for {symbol}")
-            else:
+            if response.status_code != 200:
                 response.failure(f"HTTP {response.status_code} for {symbol}")
+            elif has_price(response.content):
+                response.success()
+            else:
+                response.failure(f"Invalid response format for {symbol}")
     
     @task(1)
     def test_stock_quote_default(self):
@@ -62,13 +62,13 @@ class StockTickerUser(HttpUser):
         with self.client.get(endpoint, catch_response=True) as response:
             if response.status_code == 200:
                 try:
-                    data = response.json()
-                    if "current_price" in data and data["current_price"] is not None:
+                    # Lowest-weight task, so it can afford a full parse
+                    data = orjson.loads(response.content)
+                    if data.get("symbol") == "AAPL" and data.get("current_price") is not None:
                         response.success()
-                        print(f"✅ AAPL (default): ${data['current_price']}")
                     else:
                         response.failure("Invalid response format for default symbol")
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     response.failure("Invalid JSON response for default symbol")
             else:
                 response.failure(f"HTTP {response.status_code} for default symbol")
@@ -88,7 +88,6 @@ class StockTickerUser(HttpUser):
         with self.client.options(endpoint, headers=headers, catch_response=True) as response:
             if response.status_code == 200:
                 response.success()
-                print(f"✅ CORS preflight successful for {symbol}")
             else:
                 response.failure(f"CORS preflight failed with {response.status_code}")
 
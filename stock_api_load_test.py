@@ -10,41 +10,36 @@ Test Requirements:
 
 import random
 import time
-from locust import HttpUser, task, between
-import json
+from locust import task, between
+from locust.contrib.fasthttp import FastHttpUser
+from load_test import has_price
 
-class StockAPILoadTest(HttpUser):
+class StockAPILoadTest(FastHttpUser):
     """Load test for the specific Stock Ticker API endpoint"""
     
     # The specific API endpoint you want to test
     host = "https://q12h96ifp0.execute-api.us-east-1.amazonaws.com"
     
+    # geventhttpclient-based client: much cheaper per request than requests,
+    # so one load generator can drive far more RPS
+    network_timeout = 5.0
+    connection_timeout = 2.0
+    
     # 200ms delay between requests as specified
     wait_time = between(0.2, 0.2)
     
-    def on_start(self):
-        """Called when a user starts"""
-        print(f"🚀 Starting load test for user")
-    
     @task
     def test_llm_stock_quote(self):
         """Test the specific LLY endpoint"""
         endpoint = "/PROD/quote/LLY"
         
         with self.client.get(endpoint, catch_response=True) as response:
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    if "current_price" in data and data["current_price"] is not None:
-                        response.success()
-                        # Log successful response
-                        print(f"✅ LLY: ${data['current_price']} (Change: {data.get('quote_data', {}).get('d', 'N/A')})")
-                    else:
-                        response.failure("Invalid response format - missing current_price")
-                except json.JSONDecodeError as e:
-                    response.failure(f"Invalid JSON response: {str(e)}")
-            else:
+            if response.status_code != 200:
                 response.failure(f"HTTP {response.status_code}")
+            elif has_price(response.content):
+                response.success()
+            else:
+                response.failure("Invalid response format - missing current_price")
     
     @task(1)
     def test_other_stocks(self):
@@ -54,18 +49,12 @@ class StockAPILoadTest(HttpUser):
         endpoint = f"/PROD/quote/{symbol}"
         
         with self.client.get(endpoint, catch_response=True) as response:
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    if "current_price" in data and data["current_price"] is not None:
-                        response.success()
-                        print(f"✅ {symbol}: ${data['current_price']}")
-                    else:
-                        response.failure(f"Invalid response format for {symbol}")
-                except json.JSONDecodeError:
-                    response.failure(f"Invalid JSON response for {symbol}")
-            else:
+            if response.status_code != 200:
                 response.failure(f"HTTP {response.status_code} for {symbol}")
+            elif has_price(response.content):
+                response.success()
+            else:
+                response.failure(f"Invalid response format for {symbol}")
 
 class BurstLoadUser(StockAPILoadTest):
     """User class for burst testing (2000 concurrent requests)"""
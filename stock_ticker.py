@@ -1,50 +1,135 @@
-import json
-import urllib.request
-import boto3
+import orjson
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
-# Load environment variables for local development
-load_dotenv()
+# Load environment variables from .env file (local runs only; Lambda has no .env)
+if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
-# Cache secret so we don't fetch it on every invocation
-cached_api_key = None
+# Reuse one HTTP session (and its open connections) across invocations
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0))
 
-def get_api_key() -> str:
+def _prewarm() -> None:
+    """Best-effort: open a Finnhub connection so the first quote skips DNS and the TLS handshake."""
+    try:
+        _SESSION.head("https://finnhub.io/", timeout=0.5)
+    except requests.exceptions.RequestException:
+        pass
+
+# Opt-in: warming at import costs up to 0.5s when Finnhub is unreachable
+if os.environ.get("PREWARM_HTTPS") == "1":
+    _prewarm()
+
+# Quote cache: symbol -> (fetched_at, quote); repeat lookups within TTL_S seconds
+# are served without another Finnhub call. Keys come from callers, so the cache
+# holds at most _QUOTE_CACHE_MAX symbols and evicts the oldest entry first
+TTL_S = 30
+_QUOTE_CACHE_MAX = 256
+_QUOTE_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+# Worker threads for get_stock_quotes; sized to the session's connection pool
+_EXECUTOR = ThreadPoolExecutor(max_workers=10)
+
+class CircuitBreakerError(Exception):
+    """Raised when the Finnhub circuit breaker is open."""
+
+# Circuit breaker for Finnhub API calls
+_BREAKER_FAIL_MAX = 5        # Open circuit after 5 failed calls
+_BREAKER_RESET_TIMEOUT = 60  # Wait 60 seconds before trying again
+_breaker_failures = 0
+_breaker_open_until = 0.0
+_breaker_lock = threading.Lock()  # get_stock_quotes updates the counts from worker threads
+
+def _counts_toward_breaker(e: requests.exceptions.RequestException) -> bool:
+    """Only transport errors and 5xx/429 say Finnhub is unhealthy; other 4xx are about the request."""
+    if isinstance(e, requests.exceptions.HTTPError):
+        status = e.response.status_code if e.response is not None else 0
+        return status >= 500 or status == 429
+    return isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+@lru_cache(maxsize=None)
+def _secrets_client(region_name: str):
+    """Create the Secrets Manager client once per region; boto3 is only needed on this path."""
+    import boto3
+    return boto3.client("secretsmanager", region_name=region_name)
+
+@lru_cache(maxsize=1)
+def _load_api_key() -> str:
     """
-    Get the Finnhub API key from AWS Secrets Manager or environment variable.
-    Falls back to environment variable for local development.
+    Resolve the API key once per process; later calls return the memoized value.
+    Call _load_api_key.cache_clear() to force a fresh lookup.
     """
-    global cached_api_key
-    if cached_api_key:
-        return cached_api_key
-    
     # Check if running locally with direct API key
     local_api_key = os.environ.get("FINNHUB_API_KEY")
     if local_api_key:
-        cached_api_key = local_api_key
-        return cached_api_key
+        return local_api_key
     
     # Try to get from AWS Secrets Manager
     try:
         secret_name = os.environ.get("SECRET_NAME", "prod/finnhub/api_key")
         region_name = os.environ.get("AWS_REGION", "us-east-1")
 
-        # Create Secrets Manager client
-        client = boto3.client("secretsmanager", region_name=region_name)
-
         # Retrieve secret
-        get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-        secret_dict = json.loads(get_secret_value_response["SecretString"])
+        get_secret_value_response = _secrets_client(region_name).get_secret_value(SecretId=secret_name)
+        secret_dict = orjson.loads(get_secret_value_response["SecretString"])
         
-        cached_api_key = secret_dict["FINNHUB_API_KEY"]
-        return cached_api_key
+        return secret_dict["FINNHUB_API_KEY"]
     except Exception as e:
         raise Exception(f"Failed to retrieve API key: {str(e)}")
 
+def get_api_key() -> str:
+    """
+    Get the Finnhub API key from AWS Secrets Manager or environment variable.
+    Falls back to environment variable for local development.
+    """
+    return _load_api_key()
+
 def get_stock_quote(symbol: str) -> Dict[str, Any]:
+    """
+    Get stock quote data, reusing a cached quote for up to TTL_S seconds.
+    
+    Args:
+        symbol (str): Stock symbol (e.g., 'AAPL', 'MSFT')
+    
+    Returns:
+        Dict containing stock quote data
+    """
+    now = time.monotonic()
+    hit = _QUOTE_CACHE.get(symbol)
+    if hit and now - hit[0] < TTL_S:
+        return hit[1]
+    
+    quote = _fetch_stock_quote(symbol)
+    # Re-insert at the end so the oldest entry is the first one evicted
+    _QUOTE_CACHE.pop(symbol, None)
+    if len(_QUOTE_CACHE) >= _QUOTE_CACHE_MAX:
+        _QUOTE_CACHE.pop(next(iter(_QUOTE_CACHE)), None)
+    _QUOTE_CACHE[symbol] = (now, quote)
+    return quote
+
+get_stock_quote.cache_clear = _QUOTE_CACHE.clear
+
+def get_stock_quotes(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get stock quote data for several symbols concurrently over the shared session.
+    
+    Args:
+        symbols (List[str]): Stock symbols (e.g., ['AAPL', 'MSFT'])
+    
+    Returns:
+        Dict mapping each symbol to its quote data
+    """
+    return dict(zip(symbols, _EXECUTOR.map(get_stock_quote, symbols)))
+
+def _fetch_stock_quote(symbol: str) -> Dict[str, Any]:
     """
     Get stock quote data from Finnhub API.
     
@@ -54,14 +139,30 @@ def get_stock_quote(symbol: str) -> Dict[str, Any]:
     Returns:
         Dict containing stock quote data
     """
+    global _breaker_failures, _breaker_open_until
+    
+    # Fail fast while Finnhub is known to be down
+    if _breaker_open_until > time.monotonic():
+        raise CircuitBreakerError("Circuit breaker is open for Finnhub API")
+    
     api_key = get_api_key()
     url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={api_key}"
     
     try:
         # Use requests for better error handling and local development
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        try:
+            response = _SESSION.get(url, timeout=10)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            if _counts_toward_breaker(e):
+                with _breaker_lock:
+                    _breaker_failures += 1
+                    if _breaker_failures >= _BREAKER_FAIL_MAX:
+                        _breaker_open_until = time.monotonic() + _BREAKER_RESET_TIMEOUT
+            raise
+        with _breaker_lock:
+            _breaker_failures = 0
+        data = orjson.loads(response.content)
         
         return {
             "symbol": symbol,
@@ -76,7 +177,7 @@ def get_stock_quote(symbol: str) -> Dict[str, Any]:
         }
     except requests.exceptions.RequestException as e:
         raise Exception(f"API request failed: {str(e)}")
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise Exception(f"Failed to parse API response: {str(e)}")
     except Exception as e:
         raise Exception(f"Unexpected error: {str(e)}")
@@ -98,12 +199,17 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         return {
             "statusCode": 200,
-            "body": json.dumps(quote_data)
+            "body": orjson.dumps(quote_data).decode()
+        }
+    except CircuitBreakerError as e:
+        return {
+            "statusCode": 503,
+            "body": orjson.dumps({"error": str(e)}).decode()
         }
     except Exception as e:
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
+            "body": orjson.dumps({"error": str(e)}).decode()
         }
 
 def main():
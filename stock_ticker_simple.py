@@ -1,16 +1,18 @@
-import json
-import urllib.request
-import boto3
+import orjson
 import os
 import requests
-from dotenv import load_dotenv
 
-# Load environment variables for local development
-load_dotenv()
+# Load environment variables from .env file (local runs only; Lambda has no .env)
+if not os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Cache secret so we don't fetch it on every invocation
 cached_api_key = None
 
+# Reuse one HTTP session (and its open connections) across invocations
+_SESSION = requests.Session()
+
 def get_api_key():
     """Get the Finnhub API key from AWS Secrets Manager or environment variable."""
     global cached_api_key
@@ -28,12 +30,13 @@ def get_api_key():
         secret_name = os.environ.get("SECRET_NAME", "prod/finnhub/api_key")
         region_name = os.environ.get("AWS_REGION", "us-east-1")
 
-        # Create Secrets Manager client
+        # Create Secrets Manager client; boto3 is only needed on this path
+        import boto3
         client = boto3.client("secretsmanager", region_name=region_name)
 
         # Retrieve secret
         get_secret_value_response = client.get_secret_value(SecretId=secret_name)
-        secret_dict = json.loads(get_secret_value_response["SecretString"])
+        secret_dict = orjson.loads(get_secret_value_response["SecretString"])
         
         cached_api_key = secret_dict["FINNHUB_API_KEY"]
         return cached_api_key
@@ -46,13 +49,13 @@ def main(symbol="AAPL"):
     url = f"https://finnhub.io/api/v1/quote?symbol={symbol}&token={api_key}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = _SESSION.get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         return data
     except requests.exceptions.RequestException as e:
         raise Exception(f"API request failed: {str(e)}")
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise Exception(f"Failed to parse API response: {str(e)}")
     except Exception as e:
         raise Exception(f"Unexpected error: {str(e)}")
@@ -66,7 +69,7 @@ def lambda_handler(event, context):
         
         return {
             "statusCode": 200,
-            "body": json.dumps({
+            "body": orjson.dumps({
                 "symbol": symbol,
                 "current_price": data["c"],
                 "change": data.get("d"),
@@ -76,12 +79,12 @@ def lambda_handler(event, context):
                 "open_price": data.get("o"),
                 "previous_close": data.get("pc"),
                 "quote_data": data
-            })
+            }).decode()
         }
     except Exception as e:
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": str(e)})
+            "body": orjson.dumps({"error": str(e)}).decode()
         }
 
 if __name__ == "__main__":
@@ -109,11 +112,11 @@ if __name__ == "__main__":
             print(f"Previous Close: ${result['pc']:.2f}")
         
         print(f"\n📊 Full Quote Data:")
-        print(json.dumps({
+        print(orjson.dumps({
             "symbol": test_symbol,
             "current_price": result["c"],
             "quote_data": result
-        }, indent=2))
+        }, option=orjson.OPT_INDENT_2).decode())
         
     except Exception as e:
         print(f"❌ Error: {e}")
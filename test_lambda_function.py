@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the Lambda handler.
+Finnhub and Secrets Manager are mocked; no network access is needed.
+"""
+
+import base64
+import gzip
+import threading
+from unittest.mock import MagicMock, patch
+import orjson
+import pytest
+import lambda_function
+from lambda_function import lambda_handler
+
+pytestmark = pytest.mark.usefixtures("lambda_state")
+
+_QUOTE = {"c": 150.25, "d": 2.5, "dp": 1.69, "h": 152.0, "l": 148.75, "o": 149.5, "pc": 147.75}
+
+@pytest.fixture
+def mock_fetch():
+    with patch.object(lambda_function, "_fetch_quote", return_value=_QUOTE) as mock:
+        yield mock
+
+def test_gzip_for_payload_v2(mock_fetch):
+    """Test that HTTP API / Function URL callers accepting gzip get a compressed body."""
+    event = {"version": "2.0", "queryStringParameters": {"symbol": "AAPL"},
+             "headers": {"accept-encoding": "gzip, deflate, br"}}
+    result = lambda_handler(event, None)
+
+    assert result['statusCode'] == 200
+    assert result['isBase64Encoded'] is True
+    assert result['headers']['Content-Encoding'] == "gzip"
+    body = orjson.loads(gzip.decompress(base64.b64decode(result['body'])))
+    assert body == {"symbol": "AAPL", "current_price": 150.25, "quote_data": _QUOTE}
+
+def test_plain_body_for_rest_api(mock_fetch):
+    """Test that REST API callers get plain JSON even when they accept gzip."""
+    event = {"httpMethod": "GET", "queryStringParameters": {"symbol": "AAPL"},
+             "headers": {"Accept-Encoding": "gzip, deflate, br"}}
+    result = lambda_handler(event, None)
+
+    assert result['statusCode'] == 200
+    assert "isBase64Encoded" not in result
+    assert "Content-Encoding" not in result['headers']
+    assert orjson.loads(result['body'])['current_price'] == 150.25
+
+@pytest.fixture
+def shared_cache():
+    """Route _fetch_quote through a fake Redis client and a mocked Finnhub call."""
+    rc = MagicMock()
+    with patch.object(lambda_function, "_get_shared_cache", return_value=rc), \
+            patch.object(lambda_function, "_call_finnhub", return_value=_QUOTE) as mock_call:
+        yield rc, mock_call
+
+def test_shared_cache_hit(shared_cache):
+    """Test that a quote already in the shared cache skips Finnhub and the lock."""
+    rc, mock_call = shared_cache
+    rc.get.return_value = orjson.dumps(_QUOTE)
+
+    assert lambda_function._fetch_quote("AAPL") == _QUOTE
+    mock_call.assert_not_called()
+    rc.set.assert_not_called()
+
+def test_shared_cache_miss_fetches_and_releases_lock(shared_cache):
+    """Test that the lock owner stores the quote and deletes the lock right away."""
+    rc, mock_call = shared_cache
+    rc.get.return_value = None
+    rc.set.return_value = True
+
+    assert lambda_function._fetch_quote("AAPL") == _QUOTE
+    mock_call.assert_called_once()
+    rc.set.assert_any_call("lock:q:AAPL", 1, nx=True, px=lambda_function._SHARED_LOCK_MS)
+    rc.set.assert_called_with("q:AAPL", orjson.dumps(_QUOTE), px=lambda_function._SHARED_QUOTE_TTL_MS)
+    rc.delete.assert_called_once_with("lock:q:AAPL")
+    assert lambda_function._SHARED_LOCK_MS <= lambda_function._SHARED_QUOTE_TTL_MS
+
+def test_shared_cache_waits_while_lock_held(shared_cache):
+    """Test that a worker that loses the lock waits for the owner's result."""
+    rc, mock_call = shared_cache
+    rc.get.side_effect = [None, None, orjson.dumps(_QUOTE)]
+    rc.set.return_value = False
+
+    with patch.object(lambda_function.time, "sleep") as mock_sleep:
+        assert lambda_function._fetch_quote("AAPL") == _QUOTE
+
+    assert mock_sleep.call_count == 2
+    mock_call.assert_not_called()
+    rc.delete.assert_not_called()
+
+def test_shared_cache_error_falls_back_to_finnhub(shared_cache):
+    """Test that a Redis failure is treated as a miss and Finnhub is called directly."""
+    rc, mock_call = shared_cache
+    rc.get.side_effect = ConnectionError("cache down")
+
+    assert lambda_function._fetch_quote("AAPL") == _QUOTE
+    mock_call.assert_called_once()
+
+@pytest.mark.parametrize("symbol", [123, ["AAPL"], "AAPL; DROP", "X" * 21],
+                         ids=["int", "list", "bad-chars", "too-long"])
+def test_invalid_symbol_rejected(symbol):
+    """Test that non-string or malformed symbols get a 400 before any fetch."""
+    with patch.object(lambda_function, "_fetch_quote") as mock_fetch:
+        result = lambda_handler({"symbol": symbol}, None)
+
+    assert result['statusCode'] == 400
+    assert orjson.loads(result['body']) == {"error": "Invalid symbol"}
+    mock_fetch.assert_not_called()
+
+@pytest.mark.parametrize("event", [
+    {"symbols": ["aapl", "MSFT"]},
+    {"symbols": "AAPL,msft"},
+    {"httpMethod": "GET", "queryStringParameters": {"symbols": "AAPL, MSFT"}},
+], ids=["list", "string", "query-string"])
+def test_batch_inputs(event):
+    """Test that list, string and query-string batches all resolve to the same symbols."""
+    with patch.object(lambda_function, "_get_quote", return_value=_QUOTE):
+        result = lambda_handler(event, None)
+
+    assert result['statusCode'] == 200
+    body = orjson.loads(result['body'])
+    assert list(body['quotes']) == ["AAPL", "MSFT"]
+    assert body['quotes']['AAPL'] == {"current_price": 150.25, "quote_data": _QUOTE}
+    assert body['errors'] == {}
+
+def test_batch_deduplicates_before_cap():
+    """Test that duplicates are dropped before the 20-symbol cap is applied."""
+    symbols = [f"S{i}" for i in range(lambda_function._BATCH_MAX)]
+    with patch.object(lambda_function, "_get_quote", return_value=_QUOTE) as mock_quote:
+        result = lambda_handler({"symbols": symbols + ["s0", "S1"]}, None)
+
+    assert result['statusCode'] == 200
+    assert mock_quote.call_count == lambda_function._BATCH_MAX
+
+@pytest.mark.parametrize("symbols", [
+    [f"S{i}" for i in range(21)],
+    ["AAPL", "not a symbol"],
+    5,
+    {"AAPL": 1},
+], ids=["over-cap", "bad-symbol", "int", "dict"])
+def test_batch_rejects_invalid(symbols):
+    """Test that oversized, malformed or non-list/str batches get a 400."""
+    with patch.object(lambda_function, "_get_quote") as mock_quote:
+        result = lambda_handler({"symbols": symbols}, None)
+
+    assert result['statusCode'] == 400
+    assert "Invalid symbols" in orjson.loads(result['body'])['error']
+    mock_quote.assert_not_called()
+
+def test_batch_partial_failure():
+    """Test that failed symbols are reported in errors alongside a 200."""
+    def quote(symbol):
+        if symbol == "MSFT":
+            raise lambda_function.FinnhubAPIError("HTTP 500 from Finnhub API")
+        return _QUOTE
+
+    with patch.object(lambda_function, "_get_quote", side_effect=quote):
+        result = lambda_handler({"symbols": ["AAPL", "MSFT"]}, None)
+
+    assert result['statusCode'] == 200
+    body = orjson.loads(result['body'])
+    assert list(body['quotes']) == ["AAPL"]
+    assert body['errors'] == {"MSFT": "unavailable"}
+
+def test_batch_total_failure():
+    """Test that a batch where every symbol fails answers 503."""
+    with patch.object(lambda_function, "_get_quote", side_effect=lambda_function.CircuitBreakerError("open")):
+        result = lambda_handler({"symbols": ["AAPL", "MSFT"]}, None)
+
+    assert result['statusCode'] == 503
+    assert orjson.loads(result['body']) == {"quotes": {}, "errors": {"AAPL": "unavailable", "MSFT": "unavailable"}}
+
+def test_batch_deadline(monkeypatch):
+    """Test that symbols still pending at the batch deadline are reported as errors."""
+    monkeypatch.setattr(lambda_function, "_BATCH_TIMEOUT", 0.05)
+    release = threading.Event()
+
+    def quote(symbol):
+        if symbol == "SLOW":
+            release.wait(5)
+        return _QUOTE
+
+    try:
+        with patch.object(lambda_function, "_get_quote", side_effect=quote):
+            result = lambda_handler({"symbols": ["AAPL", "SLOW"]}, None)
+    finally:
+        release.set()
+
+    assert result['statusCode'] == 200
+    body = orjson.loads(result['body'])
+    assert list(body['quotes']) == ["AAPL"]
+    assert body['errors'] == {"SLOW": "unavailable"}
+
+@pytest.fixture
+def secret_key(monkeypatch):
+    """Serve "old_key" from Secrets Manager state, inside the refresh window."""
+    monkeypatch.delenv("FINNHUB_API_KEY")
+    monkeypatch.setattr(lambda_function, "cached_api_key", None)
+    monkeypatch.setattr(lambda_function, "_URL_SUFFIX", "")
+    monkeypatch.setattr(lambda_function, "_key_refresh_lock", threading.Lock())
+    lambda_function._set_api_key("old_key")
+    monkeypatch.setattr(lambda_function, "_key_expires_at", lambda_function.time.monotonic() + 10)
+    yield
+    # Memoized URLs carry this test's tokens; don't leak them to other tests
+    lambda_function._build_url.cache_clear()
+
+def test_key_refresh_starts_one_thread(secret_key):
+    """Test that invocations in the refresh window start a single background refresh."""
+    with patch.object(lambda_function.threading, "Thread") as mock_thread:
+        assert lambda_function.get_api_key() == "old_key"
+        assert lambda_function.get_api_key() == "old_key"
+
+    mock_thread.assert_called_once()
+    assert mock_thread.call_args.kwargs["target"] is lambda_function._refresh_api_key
+    assert mock_thread.call_args.kwargs["daemon"] is True
+    mock_thread.return_value.start.assert_called_once_with()
+
+def test_key_refresh_rotates_url_suffix(secret_key):
+    """Test that a rotated key replaces the token in memoized quote URLs."""
+    assert lambda_function._build_url("AAPL").endswith("&token=old_key")
+    lambda_function._key_refresh_lock.acquire()
+
+    with patch.object(lambda_function, "_fetch_secret_api_key", return_value="new_key") as mock_fetch:
+        lambda_function._refresh_api_key("prod/finnhub/api_key", "us-east-1")
+
+    mock_fetch.assert_called_once_with("prod/finnhub/api_key", "us-east-1", force=True)
+    assert lambda_function.cached_api_key == "new_key"
+    assert lambda_function._build_url("AAPL").endswith("&token=new_key")
+    assert lambda_function._key_expires_at > lambda_function.time.monotonic() + lambda_function._SECRET_REFRESH_INTERVAL - 5
+    assert not lambda_function._key_refresh_lock.locked()
+
+def test_key_refresh_failure_keeps_old_key(secret_key):
+    """Test that a failed refresh keeps serving the old key and retries later."""
+    lambda_function._key_refresh_lock.acquire()
+    before = lambda_function.time.monotonic()
+
+    with patch.object(lambda_function, "_fetch_secret_api_key", side_effect=RuntimeError("throttled")):
+        lambda_function._refresh_api_key("prod/finnhub/api_key", "us-east-1")
+
+    assert lambda_function.cached_api_key == "old_key"
+    assert lambda_function._build_url("AAPL").endswith("&token=old_key")
+    # Pushed past the refresh window, so the next retry waits _KEY_RETRY_INTERVAL
+    assert lambda_function._key_expires_at >= before + lambda_function._KEY_REFRESH_AHEAD + lambda_function._KEY_RETRY_INTERVAL
+    assert not lambda_function._key_refresh_lock.locked()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Reliability tests for the Lambda function.
+Exercises the retry policy and circuit breaker against a mocked Finnhub pool.
+"""
+
+from unittest.mock import MagicMock, patch
+import orjson
+import pytest
+import urllib3
+import lambda_function
+from lambda_function import lambda_handler, CircuitBreakerError
+
+pytestmark = pytest.mark.usefixtures("lambda_state")
+
+def _upstream_down():
+    return urllib3.exceptions.MaxRetryError(None, "/api/v1/quote", reason=urllib3.exceptions.NewConnectionError(None, "down"))
+
+def test_retry_policy():
+    """Test the retry settings: 2 retries (3 attempts) on connection errors and transient statuses."""
+    assert lambda_function._RETRY.total == 2
+    assert set(lambda_function._RETRY.status_forcelist) == {429, 500, 502, 503, 504}
+    assert lambda_function._HTTP.connection_pool_kw["retries"] is lambda_function._RETRY
+
+def test_circuit_breaker_opens_after_failures():
+    """Test that the breaker opens after 5 failures and then stops calling Finnhub."""
+    with patch.object(lambda_function._HTTP, "request", side_effect=_upstream_down()) as mock_request:
+        for _ in range(lambda_function._BREAKER_FAIL_MAX):
+            with pytest.raises(urllib3.exceptions.MaxRetryError):
+                lambda_function._call_finnhub("https://finnhub.io/api/v1/quote?symbol=AAPL")
+
+        with pytest.raises(CircuitBreakerError):
+            lambda_function._call_finnhub("https://finnhub.io/api/v1/quote?symbol=AAPL")
+
+    assert mock_request.call_count == lambda_function._BREAKER_FAIL_MAX
+
+def test_open_circuit_returns_503(monkeypatch):
+    """Test that an open breaker short-circuits the handler with a 503."""
+    monkeypatch.setattr(lambda_function, "_breaker_open_until", lambda_function.time.monotonic() + 60)
+
+    with patch.object(lambda_function._HTTP, "request") as mock_request:
+        result = lambda_handler({"symbol": "AAPL"}, None)
+
+    assert result['statusCode'] == 503
+    assert "circuit breaker open" in orjson.loads(result['body'])['error']
+    mock_request.assert_not_called()
+
+def test_exhausted_retries_return_503():
+    """Test that running out of retries answers 503 without leaking the request URL."""
+    with patch.object(lambda_function._HTTP, "request", side_effect=_upstream_down()):
+        result = lambda_handler({"symbol": "AAPL"}, None)
+
+    assert result['statusCode'] == 503
+    assert orjson.loads(result['body']) == {"error": "upstream_unavailable", "symbol": "AAPL"}
+    assert lambda_function._breaker_failures == 1
+
+def _finnhub_response(status):
+    response = MagicMock(status=status)
+    response.read.return_value = b'{}'
+    return response
+
+def test_client_errors_do_not_open_breaker():
+    """Test that 4xx rejections (e.g. 403 for premium symbols) leave the breaker closed."""
+    with patch.object(lambda_function._HTTP, "request", return_value=_finnhub_response(403)):
+        for _ in range(lambda_function._BREAKER_FAIL_MAX):
+            result = lambda_handler({"symbol": "PREMIUM"}, None)
+            assert result['statusCode'] == 502
+            assert orjson.loads(result['body']) == {"error": "upstream_rejected", "symbol": "PREMIUM"}
+
+        batch = lambda_handler({"symbols": [f"P{i}" for i in range(lambda_function._BREAKER_FAIL_MAX)]}, None)
+
+    assert batch['statusCode'] == 503
+    assert set(orjson.loads(batch['body'])['errors'].values()) == {"rejected"}
+    assert lambda_function._breaker_failures == 0
+    assert lambda_function._breaker_open_until == 0
+
+def test_server_errors_count_toward_breaker():
+    """Test that 5xx responses that get past the retries still count as failures."""
+    with patch.object(lambda_function._HTTP, "request", return_value=_finnhub_response(500)):
+        with pytest.raises(lambda_function.FinnhubAPIError):
+            lambda_function._call_finnhub("https://finnhub.io/api/v1/quote?symbol=AAPL")
+
+    assert lambda_function._breaker_failures == 1
+
+def test_breaker_counts_concurrent_failures(monkeypatch):
+    """Test that failures from the batch worker threads are all counted."""
+    monkeypatch.setattr(lambda_function, "_BREAKER_FAIL_MAX", 1000)
+    calls = 200
+
+    with patch.object(lambda_function, "_request_finnhub", side_effect=lambda_function.FinnhubAPIError("HTTP 503")):
+        futures = [lambda_function._POOL.submit(lambda_function._call_finnhub, "https://finnhub.io/") for _ in range(calls)]
+        for future in futures:
+            with pytest.raises(lambda_function.FinnhubAPIError):
+                future.result()
+
+    assert lambda_function._breaker_failures == calls
@@ -6,68 +6,91 @@ This script tests the core functions without making actual API calls.
 
 import unittest
 from unittest.mock import patch, MagicMock
-import json
 import os
 import sys
-from stock_ticker import get_api_key, get_stock_quote, lambda_handler
+import types
+import orjson
+import pytest
+import requests
+from stock_ticker import get_api_key, get_stock_quote, get_stock_quotes, lambda_handler, CircuitBreakerError
+
+# Canned Finnhub response shared by the quote tests (built once, never mutated)
+_QUOTE_FIXTURE = types.SimpleNamespace(
+    content=orjson.dumps({
+        'c': 150.25,  # current price
+        'd': 2.50,    # change
+        'dp': 1.69,   # change percent
+        'h': 152.00,  # high
+        'l': 148.75,  # low
+        'o': 149.50,  # open
+        'pc': 147.75  # previous close
+    }),
+    raise_for_status=lambda: None
+)
 
 class TestStockTicker(unittest.TestCase):
     
-    def setUp(self):
-        """Set up test fixtures."""
-        # Clear any cached API key
-        import stock_ticker
-        stock_ticker.cached_api_key = None
-        
-        # Mock environment variables
-        self.env_patcher = patch.dict(os.environ, {
+    @classmethod
+    def setUpClass(cls):
+        """Patch the environment once for the whole class."""
+        cls.env_patcher = patch.dict(os.environ, {
             'FINNHUB_API_KEY': 'test_api_key_12345',
             'AWS_REGION': 'us-east-1',
             'SECRET_NAME': 'test/finnhub/api_key'
         })
-        self.env_patcher.start()
+        cls.env_patcher.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Restore the environment."""
+        cls.env_patcher.stop()
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        import stock_ticker
+        get_stock_quote.cache_clear()
+        stock_ticker._breaker_failures = 0
+        stock_ticker._breaker_open_until = 0.0
     
-    def tearDown(self):
-        """Clean up after tests."""
-        self.env_patcher.stop()
+    def _fresh_cache(self):
+        """Clear the memoized API key and Secrets Manager client now and after the test."""
+        import stock_ticker
+        for cached in (stock_ticker._load_api_key, stock_ticker._secrets_client):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
     
     def test_get_api_key_local(self):
         """Test getting API key from environment variable."""
+        self._fresh_cache()
         api_key = get_api_key()
         self.assertEqual(api_key, 'test_api_key_12345')
     
     @patch('boto3.client')
     def test_get_api_key_aws(self, mock_boto_client):
         """Test getting API key from AWS Secrets Manager."""
+        self._fresh_cache()
         # Clear environment variable to force AWS lookup
         with patch.dict(os.environ, {}, clear=True):
             # Mock AWS Secrets Manager response
             mock_client = MagicMock()
             mock_response = {
-                'SecretString': json.dumps({'FINNHUB_API_KEY': 'aws_api_key_67890'})
+                'SecretString': orjson.dumps({'FINNHUB_API_KEY': 'aws_api_key_67890'}).decode()
             }
             mock_client.get_secret_value.return_value = mock_response
             mock_boto_client.return_value = mock_client
             
             api_key = get_api_key()
             self.assertEqual(api_key, 'aws_api_key_67890')
+            
+            # The secret is fetched and parsed only once
+            self.assertEqual(get_api_key(), 'aws_api_key_67890')
+            self.assertEqual(mock_client.get_secret_value.call_count, 1)
+            self.assertEqual(mock_boto_client.call_count, 1)
     
-    @patch('requests.get')
+    @patch('stock_ticker._SESSION.get')
     def test_get_stock_quote_success(self, mock_get):
         """Test successful stock quote retrieval."""
-        # Mock API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            'c': 150.25,  # current price
-            'd': 2.50,    # change
-            'dp': 1.69,   # change percent
-            'h': 152.00,  # high
-            'l': 148.75,  # low
-            'o': 149.50,  # open
-            'pc': 147.75  # previous close
-        }
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_get.return_value = _QUOTE_FIXTURE
         
         quote_data = get_stock_quote('AAPL')
         
@@ -80,7 +103,43 @@ class TestStockTicker(unittest.TestCase):
         self.assertEqual(quote_data['open_price'], 149.50)
         self.assertEqual(quote_data['previous_close'], 147.75)
     
-    @patch('requests.get')
+    @patch('stock_ticker._SESSION.get')
+    def test_quote_cache_hit(self, mock_get):
+        """Test that a repeat lookup within the TTL reuses the cached quote."""
+        mock_get.return_value = _QUOTE_FIXTURE
+        
+        first = get_stock_quote('AAPL')
+        second = get_stock_quote('AAPL')
+        
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertIs(first, second)
+    
+    @patch('stock_ticker._SESSION.get')
+    def test_quote_cache_bounded(self, mock_get):
+        """Test that the quote cache evicts the oldest symbol once it is full."""
+        import stock_ticker
+        mock_get.return_value = _QUOTE_FIXTURE
+        
+        for i in range(stock_ticker._QUOTE_CACHE_MAX + 1):
+            get_stock_quote(f'S{i}')
+        
+        self.assertEqual(len(stock_ticker._QUOTE_CACHE), stock_ticker._QUOTE_CACHE_MAX)
+        self.assertNotIn('S0', stock_ticker._QUOTE_CACHE)
+        self.assertIn(f'S{stock_ticker._QUOTE_CACHE_MAX}', stock_ticker._QUOTE_CACHE)
+    
+    @patch('stock_ticker._SESSION.get')
+    def test_get_stock_quotes(self, mock_get):
+        """Test fetching several symbols concurrently."""
+        mock_get.return_value = _QUOTE_FIXTURE
+        
+        quotes = get_stock_quotes(['AAPL', 'MSFT', 'GOOGL'])
+        
+        self.assertEqual(list(quotes), ['AAPL', 'MSFT', 'GOOGL'])
+        self.assertEqual(quotes['MSFT']['symbol'], 'MSFT')
+        self.assertEqual(quotes['MSFT']['current_price'], 150.25)
+        self.assertEqual(mock_get.call_count, 3)
+    
+    @patch('stock_ticker._SESSION.get')
     def test_get_stock_quote_api_error(self, mock_get):
         """Test handling of API errors."""
         mock_get.side_effect = Exception("API request failed")
@@ -90,63 +149,112 @@ class TestStockTicker(unittest.TestCase):
         
         self.assertIn("API request failed", str(context.exception))
     
-    def test_lambda_handler_success(self):
+    @patch('stock_ticker._SESSION.get')
+    def test_circuit_opens_after_threshold(self, mock_get):
+        """Test that the breaker opens after 5 failures and stops calling Finnhub."""
+        import stock_ticker
+        
+        # 4xx rejections (e.g. 403 for premium symbols) never open the breaker
+        rejected = MagicMock(status_code=403)
+        rejected.raise_for_status.side_effect = requests.HTTPError("403 Forbidden", response=rejected)
+        mock_get.return_value = rejected
+        for _ in range(6):
+            with self.assertRaises(Exception) as context:
+                get_stock_quote('PREMIUM')
+            self.assertIn("API request failed", str(context.exception))
+        self.assertEqual(mock_get.call_count, 6)
+        self.assertEqual(stock_ticker._breaker_open_until, 0.0)
+        
+        mock_get.reset_mock()
+        mock_get.side_effect = requests.ConnectionError("connection refused")
+        
+        for _ in range(5):
+            with self.assertRaises(Exception) as context:
+                get_stock_quote('X')
+            self.assertIn("API request failed", str(context.exception))
+        
+        with self.assertRaises(CircuitBreakerError):
+            get_stock_quote('X')
+        self.assertEqual(mock_get.call_count, 5)
+    
+    @patch('stock_ticker._SESSION.head')
+    def test_prewarm_occurs(self, mock_head):
+        """Test that the warm-up opens one Finnhub connection and swallows failures."""
+        import stock_ticker
+        stock_ticker._prewarm()
+        mock_head.assert_called_once_with("https://finnhub.io/", timeout=0.5)
+        
+        mock_head.side_effect = requests.ConnectionError("unreachable")
+        stock_ticker._prewarm()
+        self.assertEqual(mock_head.call_count, 2)
+    
+    @patch('stock_ticker._SESSION.get')
+    def test_session_reused_across_invocations(self, mock_get):
+        """Test that every invocation goes through the one module-level session."""
+        import stock_ticker
+        session = stock_ticker._SESSION
+        mock_get.return_value = _QUOTE_FIXTURE
+        
+        with patch('requests.Session') as mock_session_cls:
+            lambda_handler({'symbol': 'AAPL'}, None)
+            lambda_handler({'symbol': 'MSFT'}, None)
+        
+        mock_session_cls.assert_not_called()
+        self.assertIs(stock_ticker._SESSION, session)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(session.get_adapter('https://finnhub.io')._pool_maxsize, 10)
+
+@patch('stock_ticker.get_stock_quote', autospec=True)
+class TestLambdaHandler(unittest.TestCase):
+    
+    def test_lambda_handler_success(self, mock_get_quote):
         """Test successful Lambda handler execution."""
-        with patch('stock_ticker.get_stock_quote') as mock_get_quote:
-            mock_get_quote.return_value = {
-                'symbol': 'AAPL',
-                'current_price': 150.25,
-                'change': 2.50,
-                'change_percent': 1.69
-            }
-            
-            event = {'symbol': 'AAPL'}
-            result = lambda_handler(event, None)
-            
-            self.assertEqual(result['statusCode'], 200)
-            body = json.loads(result['body'])
-            self.assertEqual(body['symbol'], 'AAPL')
-            self.assertEqual(body['current_price'], 150.25)
+        mock_get_quote.return_value = {
+            'symbol': 'AAPL',
+            'current_price': 150.25,
+            'change': 2.50,
+            'change_percent': 1.69
+        }
+        
+        event = {'symbol': 'AAPL'}
+        result = lambda_handler(event, None)
+        
+        self.assertEqual(result['statusCode'], 200)
+        body = orjson.loads(result['body'])
+        self.assertEqual(body['symbol'], 'AAPL')
+        self.assertEqual(body['current_price'], 150.25)
+        mock_get_quote.assert_called_once_with('AAPL')
     
-    def test_lambda_handler_default_symbol(self):
+    def test_lambda_handler_default_symbol(self, mock_get_quote):
         """Test Lambda handler with default symbol."""
-        with patch('stock_ticker.get_stock_quote') as mock_get_quote:
-            mock_get_quote.return_value = {
-                'symbol': 'AAPL',
-                'current_price': 150.25
-            }
-            
-            event = {}  # No symbol provided
-            result = lambda_handler(event, None)
-            
-            self.assertEqual(result['statusCode'], 200)
-            body = json.loads(result['body'])
-            self.assertEqual(body['symbol'], 'AAPL')
+        mock_get_quote.return_value = {
+            'symbol': 'AAPL',
+            'current_price': 150.25
+        }
+        
+        event = {}  # No symbol provided
+        result = lambda_handler(event, None)
+        
+        self.assertEqual(result['statusCode'], 200)
+        body = orjson.loads(result['body'])
+        self.assertEqual(body['symbol'], 'AAPL')
     
-    def test_lambda_handler_error(self):
+    def test_lambda_handler_error(self, mock_get_quote):
         """Test Lambda handler error handling."""
-        with patch('stock_ticker.get_stock_quote') as mock_get_quote:
-            mock_get_quote.side_effect = Exception("Test error")
-            
-            event = {'symbol': 'INVALID'}
-            result = lambda_handler(event, None)
-            
-            self.assertEqual(result['statusCode'], 500)
-            body = json.loads(result['body'])
-            self.assertIn('error', body)
-            self.assertIn('Test error', body['error'])
+        mock_get_quote.side_effect = Exception("Test error")
+        
+        event = {'symbol': 'INVALID'}
+        result = lambda_handler(event, None)
+        
+        self.assertEqual(result['statusCode'], 500)
+        body = orjson.loads(result['body'])
+        self.assertIn('error', body)
+        self.assertIn('Test error', body['error'])
 
 def run_tests():
-    """Run the test suite."""
-    # Create test suite
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestStockTicker)
-    
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    # Return exit code
-    return 0 if result.wasSuccessful() else 1
+    """Run the test suite across pytest-xdist workers."""
+    workers = max(1, (os.cpu_count() or 1) - 2)
+    return int(pytest.main(["-n", str(workers), "--dist=loadfile", __file__]))
 
 if __name__ == '__main__':
     print("Running Stock Ticker Tests...")